@@ -22,12 +22,9 @@ st.set_page_config(
 
 # --- STYLING ---
 # Custom CSS to improve the mobile-first design and aesthetics.
-st.markdown("""
+# The app background colour is set by the theme in .streamlit/config.toml.
+APP_CSS = """
 <style>
-    /* General styles */
-    .stApp {
-        background-color: #f0f2f6;
-    }
     /* Style for buttons */
     .stButton > button {
         border-radius: 12px;
@@ -60,22 +57,23 @@ st.markdown("""
         color: #1565C0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Injected with st.html, which skips the Markdown parsing st.markdown does. It has to
+# be emitted on every run: Streamlit removes elements a rerun doesn't re-emit, so
+# injecting it only once per session would drop the styles after the first rerun.
+st.html(APP_CSS)
 
 
 # --- NAVIGATION ---
 def main():
     """Main function to handle page navigation."""
-    st.sidebar.title("Navigation")
-    page_options = {
-        "Prompt Generator": main_app_page,
-        "Admin Panel": admin_page
-    }
-    page_selection = st.sidebar.radio("Choose a page", list(page_options.keys()))
-
-    # Run the selected page function
-    page_options[page_selection]()
+    # st.navigation renders the page menu and routes to the selected page itself.
+    navigation = st.navigation([
+        st.Page(main_app_page, title="Prompt Generator", icon="🚀", default=True),
+        st.Page(admin_page, title="Admin Panel", icon="🔐"),
+    ])
+    navigation.run()
 
 if __name__ == "__main__":
     main()
-
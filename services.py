@@ -7,87 +7,607 @@ It separates the core business logic from the UI.
 """
 
 # --- IMPORTS ---
+import asyncio
+import atexit
+import itertools
+import json
+import logging
+import threading
+import time
 import streamlit as st
 import openai
+import tiktoken
+import aiohttp
+import httpx
+from httpx_aiohttp import AiohttpTransport
 from pyairtable import Api
+from tenacity import (
+    before_sleep_log, retry, retry_if_exception_type, retry_if_not_exception_type,
+    stop_after_attempt, wait_random_exponential,
+)
 import config  # Import configuration variables
 
+logger = logging.getLogger(__name__)
+
+# --- ASYNC RUNTIME ---
+# aiohttp sessions are bound to the event loop they were created on, so async OpenAI
+# requests all run on one long-lived loop in a background thread rather than on a
+# fresh loop per asyncio.run() call. This lets every request share the connection pool.
+# The loop is a module-level singleton rather than an st.cache_resource, because
+# "Clear cache" would otherwise start a new loop and thread while the old ones kept running.
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+def _get_event_loop():
+    """Starts the shared event loop in a daemon thread, once per process."""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name="openai-event-loop", daemon=True).start()
+        return _event_loop
+
+def _run_on_event_loop(coroutine, timeout=None):
+    """Runs a coroutine on the shared event loop and blocks until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_event_loop()).result(timeout)
+
+def _create_aiohttp_session():
+    """Creates the shared aiohttp session. Called lazily by the transport, on the event loop."""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=100, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector)
+
+# --- RATE LIMITING ---
+MAX_COMPLETION_TOKENS = 1500
+
+class _RateLimiter:
+    """
+    Client-side token bucket for OpenAI's requests-per-minute and tokens-per-minute limits,
+    following OpenAI's api_request_parallel_processor.py. Both capacities refill continuously;
+    a request waits until both cover its cost, so bursts are smoothed out instead of hitting 429s.
+    """
+
+    def __init__(self, max_requests_per_minute, max_tokens_per_minute):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_request_capacity = float(max_requests_per_minute)
+        self.available_token_capacity = float(max_tokens_per_minute)
+        self.last_update_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _try_consume(self, token_cost):
+        """Consumes capacity for one request, or returns how many seconds to wait before retrying."""
+        # A request larger than the whole token bucket would otherwise wait forever.
+        token_cost = min(token_cost, self.max_tokens_per_minute)
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.last_update_time
+            self.last_update_time = now
+            self.available_request_capacity = min(
+                self.available_request_capacity + self.max_requests_per_minute * elapsed / 60.0,
+                self.max_requests_per_minute,
+            )
+            self.available_token_capacity = min(
+                self.available_token_capacity + self.max_tokens_per_minute * elapsed / 60.0,
+                self.max_tokens_per_minute,
+            )
+
+            if self.available_request_capacity >= 1 and self.available_token_capacity >= token_cost:
+                self.available_request_capacity -= 1
+                self.available_token_capacity -= token_cost
+                return 0
+
+            request_wait = (1 - self.available_request_capacity) * 60.0 / self.max_requests_per_minute
+            token_wait = (token_cost - self.available_token_capacity) * 60.0 / self.max_tokens_per_minute
+            return max(request_wait, token_wait, 0.01)
+
+    async def acquire(self, token_cost):
+        """Waits, without blocking the event loop, until there is capacity for a request costing `token_cost` tokens."""
+        while (wait := self._try_consume(token_cost)) > 0:
+            await asyncio.sleep(wait)
+
+rate_limiter = _RateLimiter(
+    max_requests_per_minute=getattr(config, "MAX_REQUESTS_PER_MINUTE", 500),
+    max_tokens_per_minute=getattr(config, "MAX_TOKENS_PER_MINUTE", 30000),
+)
+
+@st.cache_resource(show_spinner=False)
+def _get_token_encoding():
+    """
+    Returns the tiktoken encoding for the configured model. tiktoken downloads encodings
+    on first use; a failed download raises and is not cached, so it is retried next time.
+    """
+    try:
+        return tiktoken.encoding_for_model(config.OPENAI_MODEL_NAME)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def _count_tokens(text):
+    """Counts the tokens in `text`, approximating at ~4 characters per token if tiktoken is unavailable."""
+    try:
+        encoding = _get_token_encoding()
+    except Exception:
+        return len(text) // 4
+    return len(encoding.encode(text))
+
+def _estimate_token_cost(system_prompt, user_prompt, max_tokens=MAX_COMPLETION_TOKENS):
+    """
+    Estimates the tokens a chat completion request counts against the TPM limit.
+    Tokenizing can be slow, so call this before submitting the request to the shared event loop.
+    """
+    return _count_tokens(system_prompt) + _count_tokens(user_prompt) + max_tokens
+
+
 # --- CLIENT INITIALIZATION ---
-try:
-    # Initialize OpenAI client
-    if config.OPENAI_API_KEY and config.OPENAI_API_KEY != "YOUR_OPENAI_API_KEY_HERE":
-        openai_client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
-    else:
-        openai_client = None
-        st.warning("OpenAI API Key not configured. AI features will be disabled.", icon="⚠️")
-
-    # Initialize Airtable client
-    if all([
+OPENAI_REQUEST_TIMEOUT = 30  # Seconds; stuck requests fail fast and are retried
+
+# Clients are created lazily, once per process, and shared by all sessions and reruns.
+# Missing credentials are logged once here; call sites report them when a feature is used.
+
+def _openai_configured():
+    """Returns True if an OpenAI API key has been set in config.py."""
+    return bool(config.OPENAI_API_KEY) and config.OPENAI_API_KEY != "YOUR_OPENAI_API_KEY_HERE"
+
+@st.cache_resource(show_spinner=False)
+def get_async_openai_client():
+    """
+    Returns the shared AsyncOpenAI client, or None if no API key is configured.
+    All OpenAI traffic goes through this one client, so keep-alive connections are reused across calls.
+    """
+    if not _openai_configured():
+        logger.warning("OpenAI API Key not configured. AI features will be disabled.")
+        return None
+    try:
+        # Retries are handled by _retry_transient_errors, so the SDK's own are disabled.
+        # The client sends requests through aiohttp, which holds up better than httpx's
+        # default transport under many concurrent requests.
+        client = openai.AsyncOpenAI(
+            api_key=config.OPENAI_API_KEY,
+            max_retries=0,
+            timeout=httpx.Timeout(OPENAI_REQUEST_TIMEOUT, connect=5.0),
+            http_client=openai.DefaultAsyncHttpxClient(
+                transport=AiohttpTransport(client=_create_aiohttp_session)
+            ),
+        )
+    except Exception as e:
+        st.error(f"Failed to initialize API clients. Please check your credentials. Error: {e}")
+        st.stop()
+    atexit.register(_close_async_openai_client, client, _get_event_loop())
+    return client
+
+def _close_async_openai_client(client, loop):
+    """Closes the async client, and with it the aiohttp session, on the loop it was used on."""
+    asyncio.run_coroutine_threadsafe(client.close(), loop).result(5)
+
+@st.cache_resource(show_spinner=False)
+def get_airtable_table():
+    """Returns the shared Airtable table, or None if the credentials are not fully configured."""
+    if not all([
         config.AIRTABLE_API_KEY != "YOUR_AIRTABLE_API_KEY_HERE",
         config.AIRTABLE_BASE_ID != "YOUR_AIRTABLE_BASE_ID_HERE",
         config.AIRTABLE_TABLE_NAME != "YOUR_AIRTABLE_TABLE_NAME_HERE"
     ]):
+        logger.warning("Airtable credentials not fully configured. Data storage will be disabled.")
+        return None
+    try:
         airtable_api = Api(config.AIRTABLE_API_KEY)
-        airtable_table = airtable_api.table(config.AIRTABLE_BASE_ID, config.AIRTABLE_TABLE_NAME)
-    else:
-        airtable_table = None
-        st.warning("Airtable credentials not fully configured. Data storage will be disabled.", icon="⚠️")
-
-except Exception as e:
-    st.error(f"Failed to initialize API clients. Please check your credentials. Error: {e}")
-    st.stop()
+        return airtable_api.table(config.AIRTABLE_BASE_ID, config.AIRTABLE_TABLE_NAME)
+    except Exception as e:
+        st.error(f"Failed to initialize API clients. Please check your credentials. Error: {e}")
+        st.stop()
 
 
 # --- HELPER FUNCTIONS ---
 
-def call_openai_api(system_prompt, user_prompt):
+# Transient failures are retried with jittered exponential backoff. Attempts are logged
+# rather than shown in the UI; only the final failure reaches the user.
+_TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+_retry_transient_errors = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(min=1, max=20),
+    retry=retry_if_exception_type(_TRANSIENT_ERRORS),
+    before_sleep=before_sleep_log(logger, logging.INFO),
+    reraise=True,
+)
+
+def _chat_completion_params(system_prompt, user_prompt, temperature=0.7, max_tokens=MAX_COMPLETION_TOKENS):
+    """Builds the chat completion arguments shared by every OpenAI call in this module."""
+    return {
+        "model": config.OPENAI_MODEL_NAME,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+
+@_retry_transient_errors
+async def _create_chat_completion(
+    token_cost, system_prompt, user_prompt, temperature=0.7, max_tokens=MAX_COMPLETION_TOKENS, **options
+):
+    """
+    Sends a rate-limited chat completion request, retrying transient errors.
+    `token_cost` is the request's _estimate_token_cost.
+    """
+    await rate_limiter.acquire(token_cost)
+    return await get_async_openai_client().chat.completions.create(
+        **_chat_completion_params(system_prompt, user_prompt, temperature, max_tokens), **options
+    )
+
+# For requests given a longer timeout because they are expected to run long: a timed-out
+# attempt would most likely time out again, so only the other transient errors are retried.
+# (APITimeoutError subclasses APIConnectionError, hence the explicit exclusion.)
+_create_long_chat_completion = _create_chat_completion.retry_with(
+    retry=retry_if_exception_type(_TRANSIENT_ERRORS) & retry_if_not_exception_type(openai.APITimeoutError)
+)
+
+async def _next_chunk(stream):
+    """Returns the next chunk of an async stream, or None once it is exhausted."""
+    return await anext(stream, None)
+
+def _call_openai_api_raw(
+    system_prompt, user_prompt, temperature, response_format=None, max_tokens=MAX_COMPLETION_TOKENS,
+    timeout=None,
+):
+    """Returns the text of a chat completion. Errors are raised, not displayed."""
+    options = {"response_format": response_format} if response_format else {}
+    create_chat_completion = _create_chat_completion
+    if timeout is not None:
+        options["timeout"] = httpx.Timeout(timeout, connect=5.0)
+        create_chat_completion = _create_long_chat_completion
+    token_cost = _estimate_token_cost(system_prompt, user_prompt, max_tokens)
+    response = _run_on_event_loop(
+        create_chat_completion(token_cost, system_prompt, user_prompt, temperature, max_tokens, **options)
+    )
+    choice = response.choices[0]
+    if response_format and choice.finish_reason == "length":
+        # Structured output cut off at max_tokens is incomplete JSON; fail instead of returning it.
+        raise ValueError(f"The response exceeded the {max_tokens}-token limit and was cut off.")
+    return choice.message.content.strip()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _call_openai_api_cached(
+    system_prompt, user_prompt, temperature, response_format=None, max_tokens=MAX_COMPLETION_TOKENS,
+    timeout=None,
+):
+    """Memoized _call_openai_api_raw. Exceptions are not cached, so failed calls are retried."""
+    return _call_openai_api_raw(system_prompt, user_prompt, temperature, response_format, max_tokens, timeout)
+
+def clear_openai_cache():
+    """Drops all responses memoized by cacheable OpenAI calls."""
+    _call_openai_api_cached.clear()
+
+def call_openai_api(
+    system_prompt, user_prompt, temperature=0.7, cacheable=False, response_format=None,
+    max_tokens=MAX_COMPLETION_TOKENS, timeout=None,
+):
     """
     Generic function to call the OpenAI ChatCompletion API.
     It uses the model name specified in the config.py file.
+    With cacheable=True, repeated calls with the same arguments are answered from a
+    one-hour cache instead of calling the API again. `response_format` is passed to
+    the API as-is, e.g. to request structured JSON output; a structured response cut
+    off by `max_tokens` is reported as an error. Requests expected to take longer than
+    OPENAI_REQUEST_TIMEOUT can pass their own `timeout` in seconds; timeouts of such
+    requests are not retried.
     """
-    if not openai_client:
+    if not get_async_openai_client():
         st.error("OpenAI client is not initialized. Cannot call API.")
         return None
 
     try:
-        response = openai_client.chat.completions.create(
-            model=config.OPENAI_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.7,
-            max_tokens=1500,
+        if cacheable:
+            return _call_openai_api_cached(
+                system_prompt, user_prompt, temperature, response_format, max_tokens, timeout
+            )
+        return _call_openai_api_raw(system_prompt, user_prompt, temperature, response_format, max_tokens, timeout)
+    except openai.APIError as e:
+        st.error(f"An OpenAI API error occurred: {e}")
+    except Exception as e:
+        st.error(f"An unexpected error occurred while calling OpenAI: {e}")
+    return None
+
+def call_openai_api_stream(system_prompt, user_prompt):
+    """
+    Streaming variant of call_openai_api.
+    Returns a generator yielding the response text as it arrives, for use with st.write_stream.
+    Errors are displayed and then re-raised, so callers can tell a stream that failed
+    partway through from a complete response.
+    """
+    if not get_async_openai_client():
+        st.error("OpenAI client is not initialized. Cannot call API.")
+        return
+
+    stream = None
+    try:
+        # Only opening the stream is retried; a failure mid-stream ends the generator.
+        token_cost = _estimate_token_cost(system_prompt, user_prompt)
+        stream = _run_on_event_loop(
+            _create_chat_completion(token_cost, system_prompt, user_prompt, stream=True)
         )
-        return response.choices[0].message.content.strip()
+        while (chunk := _run_on_event_loop(_next_chunk(stream))) is not None:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
     except openai.APIError as e:
         st.error(f"An OpenAI API error occurred: {e}")
+        raise
     except Exception as e:
         st.error(f"An unexpected error occurred while calling OpenAI: {e}")
+        raise
+    finally:
+        # Release the connection even if the caller stops reading early.
+        if stream is not None:
+            _run_on_event_loop(stream.close())
+
+def async_call_openai_api(system_prompt, user_prompt, temperature=0.7):
+    """
+    Async version of call_openai_api, for requests that should run concurrently.
+    Returns a coroutine for run_concurrently; the token cost is estimated here, on the
+    calling thread, so tokenizing doesn't hold up other requests on the event loop.
+    Errors are raised instead of displayed so callers can collect them with
+    run_concurrently and render them after all requests have finished.
+    """
+    if not get_async_openai_client():
+        raise RuntimeError("OpenAI client is not initialized. Cannot call API.")
+
+    token_cost = _estimate_token_cost(system_prompt, user_prompt)
+    return _completion_text(_create_chat_completion(token_cost, system_prompt, user_prompt, temperature))
+
+async def _completion_text(completion):
+    """Awaits a chat completion and returns its text."""
+    response = await completion
+    return response.choices[0].message.content.strip()
+
+def run_concurrently(*coroutines):
+    """
+    Runs the given coroutines concurrently and waits for all of them.
+    Results are returned in order; a failed coroutine yields its exception.
+    """
+    async def gather():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    return _run_on_event_loop(gather())
+
+# A single call, including its completion, must fit in the tokens-per-minute budget,
+# or the rate limiter lets it through only for the API to reject it with a 429.
+TREND_ANALYSIS_TOKEN_LIMIT = min(
+    getattr(config, "TREND_ANALYSIS_TOKEN_LIMIT", 60000),
+    rate_limiter.max_tokens_per_minute - MAX_COMPLETION_TOKENS,
+)
+# Map-reduce chunks are sized so that two requests, completions included, fit in the
+# tokens-per-minute budget at once.
+TREND_ANALYSIS_CHUNK_TOKEN_LIMIT = min(
+    TREND_ANALYSIS_TOKEN_LIMIT, rate_limiter.max_tokens_per_minute // 2 - MAX_COMPLETION_TOKENS
+)
+DOCUMENT_SEPARATOR = "\n\n---\n\n"
+
+def _chunk_by_tokens(documents, chunk_token_limit):
+    """Groups documents, in order, into chunks of roughly `chunk_token_limit` tokens, separators included."""
+    separator_tokens = _count_tokens(DOCUMENT_SEPARATOR)
+    chunks, chunk, chunk_tokens = [], [], 0
+    for document in documents:
+        document_tokens = _count_tokens(document) + separator_tokens
+        if chunk and chunk_tokens + document_tokens > chunk_token_limit:
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], 0
+        chunk.append(document)
+        chunk_tokens += document_tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def analyze_trends(documents, system_prompt):
+    """
+    Produces one report over a list of documents.
+    If they fit within TREND_ANALYSIS_TOKEN_LIMIT tokens they are analyzed in a single call;
+    otherwise they are map-reduced: chunks are analyzed concurrently, and the partial
+    reports are chunked and merged again until they fit in a final call. Returns None on
+    failure or if there are no documents.
+    """
+    if not documents:
+        return None
+    merge_system_prompt = (
+        f"{system_prompt}\n\nThe input consists of partial reports, each covering a subset of "
+        "the data. Merge them into a single report."
+    )
+
+    while True:
+        system_tokens = _count_tokens(system_prompt)
+        all_documents = DOCUMENT_SEPARATOR.join(documents)
+        if system_tokens + _count_tokens(all_documents) <= TREND_ANALYSIS_TOKEN_LIMIT:
+            return call_openai_api(system_prompt, all_documents)
+
+        chunks = _chunk_by_tokens(documents, TREND_ANALYSIS_CHUNK_TOKEN_LIMIT - system_tokens)
+        if system_prompt is merge_system_prompt and len(chunks) == len(documents):
+            # Each partial report fills a chunk on its own, so merging would never converge.
+            st.error("The token limits are too small to merge the partial trend reports.")
+            return None
+        partial_reports = run_concurrently(*(
+            async_call_openai_api(system_prompt, DOCUMENT_SEPARATOR.join(chunk)) for chunk in chunks
+        ))
+        for report in partial_reports:
+            if isinstance(report, Exception):
+                st.error(f"An error occurred while analyzing part of the collection: {report}")
+                return None
+        documents, system_prompt = partial_reports, merge_system_prompt
+
+def submit_batch(prompts, system_prompt):
+    """
+    Submits one chat completion request per prompt to the OpenAI Batch API.
+    `prompts` maps a custom id (e.g. the Airtable record id) to the prompt text.
+    Returns the batch id, or None if the submission failed.
+    """
+    openai_client = get_async_openai_client()
+    if not openai_client:
+        st.error("OpenAI client is not initialized. Cannot call API.")
+        return None
+
+    batch_lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": config.OPENAI_MODEL_NAME,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.7,
+                "max_tokens": MAX_COMPLETION_TOKENS,
+            },
+        })
+        for custom_id, prompt in prompts.items()
+    ]
+
+    try:
+        batch_file = _run_on_event_loop(openai_client.files.create(
+            file=("batch_input.jsonl", "\n".join(batch_lines).encode("utf-8")),
+            purpose="batch",
+        ))
+        batch = _run_on_event_loop(openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        ))
+        return batch.id
+    except openai.APIError as e:
+        st.error(f"An OpenAI API error occurred: {e}")
+    except Exception as e:
+        st.error(f"An unexpected error occurred while submitting the batch: {e}")
     return None
 
-def save_to_airtable(data):
-    """Saves a dictionary of data to the configured Airtable table."""
+def fetch_batch_results(batch_id):
+    """
+    Checks on a batch submitted with submit_batch.
+    Returns a (status, results) tuple; once the batch has completed, results maps
+    each custom id to its response text (None for failed requests), otherwise it is None.
+    """
+    openai_client = get_async_openai_client()
+    if not openai_client:
+        st.error("OpenAI client is not initialized. Cannot call API.")
+        return None, None
+
+    try:
+        batch = _run_on_event_loop(openai_client.batches.retrieve(batch_id))
+        if batch.status != "completed":
+            return batch.status, None
+
+        # Successful requests are written to the output file and failed ones to the error file.
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            output = _run_on_event_loop(openai_client.files.content(file_id)).text
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") == 200:
+                    message = response["body"]["choices"][0]["message"]["content"]
+                    results[item["custom_id"]] = message.strip()
+                else:
+                    results[item["custom_id"]] = None
+        return batch.status, results
+    except openai.APIError as e:
+        st.error(f"An OpenAI API error occurred: {e}")
+    except Exception as e:
+        st.error(f"An unexpected error occurred while checking the batch: {e}")
+    return None, None
+
+AIRTABLE_BATCH_SIZE = 10  # Airtable accepts at most 10 records per create request
+
+# Records buffered by save_to_airtable until the next flush_writes.
+_pending_writes = []
+_pending_writes_lock = threading.Lock()
+
+def save_to_airtable(data, immediate=False):
+    """
+    Saves a dictionary of data to the configured Airtable table.
+    By default the record is buffered and written in a batch once AIRTABLE_BATCH_SIZE
+    records are pending (or on flush_writes); pass immediate=True to write it right away.
+    """
+    airtable_table = get_airtable_table()
     if not airtable_table:
         st.warning("Airtable is not configured. Data not saved.")
         return False
+
+    if not immediate:
+        with _pending_writes_lock:
+            _pending_writes.append(data)
+            batch_full = len(_pending_writes) >= AIRTABLE_BATCH_SIZE
+        if batch_full and not flush_writes():
+            st.error("Failed to save buffered records to Airtable. They will be retried on the next flush.")
+            return False
+        return True
+
     try:
         airtable_table.create(data)
+        _fetch_from_airtable_cached.clear()  # Invalidate cached records so the new one shows up
         st.toast("Prompt saved to Airtable!", icon="📄")
         return True
     except Exception as e:
         st.error(f"Failed to save data to Airtable: {e}")
         return False
 
-def fetch_from_airtable():
-    """Fetches all records from the configured Airtable table."""
-    if not airtable_table:
+@atexit.register
+def flush_writes():
+    """
+    Writes all records buffered by save_to_airtable using batch creates.
+    Returns False if the write failed, in which case the records stay buffered.
+    """
+    with _pending_writes_lock:
+        records = _pending_writes[:]
+        _pending_writes.clear()
+    if not records:
+        return True
+    airtable_table = get_airtable_table()
+
+    try:
+        # pyairtable splits the records into requests of up to 10.
+        airtable_table.batch_create(records, typecast=True)
+    except Exception:
+        logger.exception("Failed to write %d buffered records to Airtable", len(records))
+        with _pending_writes_lock:
+            _pending_writes[:0] = records
+        return False
+    _fetch_from_airtable_cached.clear()
+    return True
+
+# Fields shown in the admin panel; other fields are not fetched.
+DISPLAY_FIELDS = ['Timestamp', 'Goal', 'Context', 'GeneratedPrompt']
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_from_airtable_cached(max_records):
+    """
+    Fetches up to `max_records` of the newest records from the configured Airtable table,
+    so reruns of the admin page don't page through the table again. Cleared by
+    save_to_airtable. Exceptions are not cached, so a failed fetch is retried on the next run.
+    """
+    pages = get_airtable_table().iterate(
+        page_size=100,
+        max_records=max_records,
+        fields=DISPLAY_FIELDS,
+        sort=['-Timestamp'],
+    )
+    return list(itertools.chain.from_iterable(pages))
+
+def fetch_from_airtable(max_records=500):
+    """
+    Fetches up to `max_records` of the newest records from the configured Airtable table.
+    Pass max_records=None to fetch every record.
+    """
+    if not get_airtable_table():
         st.warning("Airtable is not configured. Cannot fetch data.")
         return []
     try:
-        return airtable_table.all()
+        return _fetch_from_airtable_cached(max_records)
     except Exception as e:
         st.error(f"Failed to fetch data from Airtable: {e}")
         return []
-
-
@@ -8,11 +8,54 @@ This file contains the functions that render the Streamlit pages for the applica
 # --- IMPORTS ---
 import streamlit as st
 import pandas as pd
-import datetime
+from datetime import datetime, timezone
 import json
-from services import call_openai_api, save_to_airtable, fetch_from_airtable
+from itertools import islice
+from services import (
+    call_openai_api, call_openai_api_stream, clear_openai_cache,
+    submit_batch, fetch_batch_results, analyze_trends, save_to_airtable, fetch_from_airtable,
+    DISPLAY_FIELDS,
+)
 from config import ADMIN_PASSWORD
 
+# Structured output for the single-prompt analysis, so quality, metadata and the
+# strengths & weaknesses summary all come back from one request.
+PROMPT_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "quality": {
+            "type": "string",
+            "description": "Markdown assessment of the prompt's clarity, specificity and effectiveness.",
+        },
+        "metadata": {
+            "type": "object",
+            "properties": {
+                "domain": {"type": "string"},
+                "task_type": {"type": "string"},
+                "target_audience": {"type": "string"},
+                "output_format": {"type": "string"},
+                "tone": {"type": "string"},
+                "keywords": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["domain", "task_type", "target_audience", "output_format", "tone", "keywords"],
+            "additionalProperties": False,
+        },
+        "strengths_weaknesses": {
+            "type": "string",
+            "description": "Concise markdown summary of the prompt's strengths and weaknesses.",
+        },
+    },
+    "required": ["quality", "metadata", "strengths_weaknesses"],
+    "additionalProperties": False,
+}
+
+# All three sections come back in one response, so it gets a larger completion
+# budget than single-answer calls.
+PROMPT_ANALYSIS_MAX_TOKENS = 4000
+# Seconds; the response only arrives once all of it has been generated, which can
+# take well over the default request timeout.
+PROMPT_ANALYSIS_TIMEOUT = 120
+
 # --- MAIN APPLICATION PAGE ---
 
 def main_app_page():
@@ -20,74 +63,99 @@ def main_app_page():
     st.title("🚀 AI Prompt Engineer")
     st.markdown("Craft the perfect AI prompt by answering a few simple questions. Let AI help you build a better prompt!")
 
-    with st.form(key="prompt_form"):
+    # Widgets are bound to stable session-state keys (read back in the submit handler),
+    # so their identity and values are preserved across reruns.
+    with st.form(key="prompt_form", clear_on_submit=False):
         st.subheader("1. Define Your Goal")
-        goal = st.text_area(
+        st.text_area(
             "What is the primary objective of your prompt? What do you want the AI to do?",
             placeholder="e.g., Generate a marketing email, write a Python script, summarize a research paper.",
-            help="Be specific about the final output you expect."
+            help="Be specific about the final output you expect.",
+            key="goal"
         )
 
         st.subheader("2. Provide Context")
-        context = st.text_area(
+        st.text_area(
             "What background information is necessary for the AI to understand the task?",
             placeholder="e.g., Product details, target audience demographics, key points of the paper.",
-            help="Imagine you're explaining the task to a new team member."
+            help="Imagine you're explaining the task to a new team member.",
+            key="context"
         )
 
         st.subheader("3. Specify the Format")
-        output_format = st.text_input(
+        st.text_input(
             "What structure or format should the AI's response follow?",
             placeholder="e.g., A JSON object, a list of bullet points, a 3-paragraph essay.",
-            help="Examples: 'A professional email', 'A markdown table', 'A python function'."
+            help="Examples: 'A professional email', 'A markdown table', 'A python function'.",
+            key="format"
         )
 
         st.subheader("4. Set the Tone & Style")
-        tone = st.selectbox(
+        st.selectbox(
             "What tone of voice should the AI adopt?",
             ["Professional", "Casual", "Enthusiastic", "Formal", "Humorous", "Neutral", "Empathetic"],
-            help="This sets the personality of the AI's response."
+            help="This sets the personality of the AI's response.",
+            key="tone"
         )
 
         st.subheader("5. Add Constraints")
-        constraints = st.text_area(
+        st.text_area(
             "What are the 'rules' or constraints? What should the AI avoid?",
             placeholder="e.g., Do not exceed 200 words, avoid technical jargon, must include a call-to-action.",
-            help="Define the boundaries for the AI."
+            help="Define the boundaries for the AI.",
+            key="constraints"
         )
 
         submit_button = st.form_submit_button(label="✨ Generate My Prompt!")
 
     if submit_button:
+        goal = st.session_state.goal
+        context = st.session_state.context
+        output_format = st.session_state.format
+        tone = st.session_state.tone
+        constraints = st.session_state.constraints
+
         if not all([goal, context, output_format, tone]):
             st.warning("Please fill out all the required fields to generate a high-quality prompt.")
             return
 
-        with st.spinner("Your prompt is being engineered... Please wait."):
-            system_prompt_for_generation = (
-                "You are an expert in prompt engineering. Your task is to synthesize user-provided components "
-                "(goal, context, format, tone, constraints) into a single, comprehensive, and highly effective prompt. "
-                "The final prompt should be clear, detailed, and ready to be used with a powerful AI model like GPT-5. "
-                "Structure the prompt logically, often starting with the role, followed by the task, context, and clear instructions."
-            )
-            user_input_summary = (
-                f"**Goal:**\n{goal}\n\n"
-                f"**Context:**\n{context}\n\n"
-                f"**Desired Format:**\n{output_format}\n\n"
-                f"**Tone of Voice:**\n{tone}\n\n"
-                f"**Constraints:**\n{constraints}\n"
-            )
+        system_prompt_for_generation = (
+            "You are an expert in prompt engineering. Your task is to synthesize user-provided components "
+            "(goal, context, format, tone, constraints) into a single, comprehensive, and highly effective prompt. "
+            "The final prompt should be clear, detailed, and ready to be used with a powerful AI model like GPT-5. "
+            "Structure the prompt logically, often starting with the role, followed by the task, context, and clear instructions."
+        )
+        user_input_summary = (
+            f"**Goal:**\n{goal}\n\n"
+            f"**Context:**\n{context}\n\n"
+            f"**Desired Format:**\n{output_format}\n\n"
+            f"**Tone of Voice:**\n{tone}\n\n"
+            f"**Constraints:**\n{constraints}\n"
+        )
 
-            generated_prompt = call_openai_api(system_prompt_for_generation, user_input_summary)
+        # Stream the prompt as it is generated; on success the placeholder is cleared
+        # and the full text is rendered in the code block below.
+        stream_placeholder = st.empty()
+        try:
+            with stream_placeholder.container():
+                st.info("Your prompt is being engineered...")
+                generated_prompt = st.write_stream(
+                    call_openai_api_stream(system_prompt_for_generation, user_input_summary)
+                )
+        except Exception:
+            # The error is already shown in the placeholder; keep it and don't save the partial prompt.
+            generated_prompt = None
 
-            if generated_prompt:
-                st.session_state.generated_prompt = generated_prompt
-                airtable_data = {
-                    "Goal": goal, "Context": context, "Format": output_format,
-                    "Tone": tone, "Constraints": constraints, "GeneratedPrompt": generated_prompt,
-                    "Timestamp": datetime.datetime.utcnow().isoformat()
-                }
-                save_to_airtable(airtable_data)
+        if generated_prompt:
+            stream_placeholder.empty()
+            generated_prompt = generated_prompt.strip()
+            st.session_state.generated_prompt = generated_prompt
+            airtable_data = {
+                "Goal": goal, "Context": context, "Format": output_format,
+                "Tone": tone, "Constraints": constraints, "GeneratedPrompt": generated_prompt,
+                "Timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds")
+            }
+            save_to_airtable(airtable_data, immediate=True)
 
     if "generated_prompt" in st.session_state:
         st.success("✅ Prompt successfully generated!")
@@ -105,8 +173,80 @@ def main_app_page():
         with col2:
             st.button("📋 Copy Prompt", help="Click the copy icon on the top right of the prompt box above.", use_container_width=True, disabled=True)
 
+# --- PROMPT ANALYZER ---
+
+@st.fragment
+def prompt_analyzer(record_ids, records_by_id):
+    """
+    Renders the single-prompt analyzer of the admin panel.
+    As a fragment, selecting a record or running an analysis reruns only this
+    section instead of the whole page (Airtable fetch, table and batch report).
+    """
+    st.header("🔬 Analyze a Single Prompt")
+    selected_id = st.selectbox(
+        "Select a prompt to analyze by its Record ID:",
+        options=record_ids,
+        format_func=lambda x: f"Record ...{x[-5:]}"
+    )
+
+    if selected_id:
+        selected_record = records_by_id[selected_id]
+        prompt_to_analyze = selected_record.get('GeneratedPrompt')
+
+        st.markdown("#### Selected Prompt:")
+        st.code(prompt_to_analyze, language='text')
+
+        if st.button("Analyze This Prompt"):
+            analysis_system_prompt = (
+                "You are a prompt quality analysis expert, metadata extraction AI and strategic analyst... "
+                "Assess the prompt's quality, extract its metadata, and provide a concise summary of its strengths and weaknesses."
+            )
+            with st.spinner("Running GPT-5 analysis... This may take a moment."):
+                analysis_json = call_openai_api(
+                    analysis_system_prompt, prompt_to_analyze, cacheable=True,
+                    max_tokens=PROMPT_ANALYSIS_MAX_TOKENS, timeout=PROMPT_ANALYSIS_TIMEOUT,
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {"name": "prompt_analysis", "schema": PROMPT_ANALYSIS_SCHEMA, "strict": True},
+                    },
+                )
+            if analysis_json is None:
+                return  # call_openai_api has already shown the error
+            try:
+                analysis = json.loads(analysis_json)
+            except json.JSONDecodeError as e:
+                st.error(f"Could not parse the analysis response: {e}")
+                return
+
+            # 1. Quality Analysis
+            st.subheader("📊 Quality Analysis")
+            st.markdown(analysis.get("quality") or "Could not generate analysis.")
+
+            # 2. Metadata Extraction
+            st.subheader("🔖 Extracted Metadata")
+            if analysis.get("metadata"):
+                st.json(analysis["metadata"])
+            else:
+                st.text("Could not extract metadata.")
+
+            # 3. Strengths & Weaknesses Summary
+            st.subheader("👍 Strengths & Weaknesses 👎")
+            st.markdown(analysis.get("strengths_weaknesses") or "Could not generate summary.")
+
 # --- ADMIN PANEL PAGE ---
 
+@st.cache_data(show_spinner=False)
+def prepare_records(records):
+    """
+    Builds everything the admin panel derives from a set of Airtable records in one
+    cached pass: a DataFrame with one row per record and a 'record_id' column, the
+    record ids in order, and a mapping of record id to fields for constant-time lookups.
+    """
+    rows = [{**record['fields'], 'record_id': record['id']} for record in records]
+    ids = [record['id'] for record in records]
+    records_by_id = {record['id']: record['fields'] for record in records}
+    return pd.DataFrame(rows), ids, records_by_id
+
 def admin_page():
     """Renders the password-protected admin panel."""
     st.title("🔐 Admin Panel")
@@ -127,63 +267,98 @@ def admin_page():
 
     st.success("Logged in successfully.")
 
-    records = fetch_from_airtable()
+    if st.sidebar.button("Clear cache", help="Forget memoized analysis results."):
+        clear_openai_cache()
+        st.toast("Cached analyses cleared.")
+
+    if "max_records" not in st.session_state:
+        st.session_state.max_records = 500
+
+    records = fetch_from_airtable(st.session_state.max_records)
     if not records:
         st.warning("No records found in Airtable or service is not configured.")
         st.stop()
 
-    df = pd.DataFrame([record['fields'] for record in records])
-    df['record_id'] = [record['id'] for record in records]
-    
-    display_columns = ['Timestamp', 'Goal', 'Context', 'GeneratedPrompt', 'record_id']
-    df_display = df[[col for col in display_columns if col in df.columns]]
+    df, record_ids, records_by_id = prepare_records(records)
     
-    st.subheader("📋 All Prompt Submissions")
-    st.dataframe(df_display, use_container_width=True)
-
-    st.header("🔬 Analyze a Single Prompt")
-    selected_id = st.selectbox(
-        "Select a prompt to analyze by its Record ID:",
-        options=df['record_id'].tolist(),
-        format_func=lambda x: f"Record ...{x[-5:]}"
-    )
+    if "page_size" not in st.session_state:
+        st.session_state.page_size = 25
 
-    if selected_id:
-        selected_record = df[df['record_id'] == selected_id].iloc[0]
-        prompt_to_analyze = selected_record['GeneratedPrompt']
+    # Only send the first page of rows to the browser, with prompts cut to a short
+    # preview; the full text is shown when a record is selected in the analyzer below.
+    display_columns = DISPLAY_FIELDS + ['record_id']
+    df_display = df[[col for col in display_columns if col in df.columns]].head(st.session_state.page_size)
+    if 'GeneratedPrompt' in df_display.columns:
+        prompts = df_display['GeneratedPrompt']
+        df_display = df_display.assign(
+            GeneratedPrompt=prompts.where(prompts.str.len() <= 200, prompts.str.slice(0, 200) + '…')
+        )
 
-        st.markdown("#### Selected Prompt:")
-        st.code(prompt_to_analyze, language='text')
+    st.subheader("📋 All Prompt Submissions")
+    st.dataframe(df_display, use_container_width=True)
+    st.caption(f"Showing {len(df_display)} of {len(df)} loaded records.")
+    if st.session_state.page_size < len(df):
+        if st.button("Load next 25"):
+            st.session_state.page_size += 25
+            st.rerun()
+    # Only the newest records are fetched; a full page means older ones may exist.
+    elif len(records) >= st.session_state.max_records:
+        if st.button("Load more"):
+            st.session_state.max_records += 500
+            st.rerun()
 
-        if st.button("Analyze This Prompt"):
-            with st.spinner("Running GPT-5 analysis... This may take a moment."):
-                # 1. Quality Analysis
-                st.subheader("📊 Quality Analysis")
-                quality_system_prompt = "You are a prompt quality analysis expert..."
-                quality_analysis = call_openai_api(quality_system_prompt, prompt_to_analyze)
-                st.markdown(quality_analysis or "Could not generate analysis.")
-
-                # 2. Metadata Extraction
-                st.subheader("🔖 Extracted Metadata")
-                metadata_system_prompt = "You are a metadata extraction AI... Return the output as a clean JSON object."
-                metadata_analysis = call_openai_api(metadata_system_prompt, prompt_to_analyze)
-                try:
-                    st.json(json.loads(metadata_analysis))
-                except (json.JSONDecodeError, TypeError):
-                    st.text(metadata_analysis or "Could not extract metadata.")
-
-                # 3. Strengths & Weaknesses Summary
-                st.subheader("👍 Strengths & Weaknesses 👎")
-                summary_system_prompt = "You are a strategic analyst... Provide a concise summary..."
-                summary_analysis = call_openai_api(summary_system_prompt, prompt_to_analyze)
-                st.markdown(summary_analysis or "Could not generate summary.")
+    prompt_analyzer(record_ids, records_by_id)
 
     st.header("📈 Batch Trend Analysis")
     st.markdown("Analyze all stored prompts to identify patterns and insights.")
     if st.button("Run Batch Analysis on All Prompts"):
-        with st.spinner("Analyzing trends across all prompts... This could take some time."):
-            all_prompts = "\n\n---\n\n".join(df['GeneratedPrompt'].dropna().tolist())
-            batch_system_prompt = "You are a data analyst specializing in AI prompt trends..."
-            batch_analysis = call_openai_api(batch_system_prompt, all_prompts)
-            st.subheader("Trend Analysis Report")
-            st.markdown(batch_analysis or "Could not generate batch analysis.")
+        # Each prompt is sent as its own request through the Batch API, which runs
+        # asynchronously on OpenAI's side instead of blocking this session. The table
+        # above only loads the newest records, so every record is fetched here.
+        prompts = {
+            record['id']: record['fields']['GeneratedPrompt']
+            for record in fetch_from_airtable(max_records=None)
+            if record['fields'].get('GeneratedPrompt')
+        }
+        batch_system_prompt = "You are a data analyst specializing in AI prompt trends..."
+        batch_id = submit_batch(prompts, batch_system_prompt)
+        if batch_id:
+            st.session_state.pending_batch = batch_id
+            st.session_state.pop("batch_results", None)
+            st.session_state.pop("batch_report", None)
+
+    if "pending_batch" in st.session_state:
+        batch_id = st.session_state.pending_batch
+        st.info(f"Batch `{batch_id}` submitted. Results are usually ready within minutes, at most 24 hours.")
+        if st.button("Check batch status"):
+            status, results = fetch_batch_results(batch_id)
+            if results is not None:
+                st.session_state.batch_results = results
+                st.session_state.batch_page_size = 25
+                del st.session_state.pending_batch
+                # Reduce the per-prompt analyses into one report; large collections are
+                # map-reduced by analyze_trends so they never exceed the context window.
+                with st.spinner("Analyzing trends across all prompts... This could take some time."):
+                    trend_system_prompt = "You are a data analyst specializing in AI prompt trends... Identify patterns and insights across these prompt analyses."
+                    analyses = [analysis for analysis in results.values() if analysis]
+                    st.session_state.batch_report = analyze_trends(analyses, trend_system_prompt)
+            elif status in ("failed", "expired", "cancelled"):
+                st.error(f"Batch `{batch_id}` did not complete (status: {status}).")
+                del st.session_state.pending_batch
+            elif status:
+                st.info(f"Batch is still running (status: {status}).")
+
+    if "batch_results" in st.session_state:
+        st.subheader("Trend Analysis Report")
+        st.markdown(st.session_state.get("batch_report") or "Could not generate batch analysis.")
+        # Paged like the table above: expander content is sent even when collapsed.
+        batch_results = st.session_state.batch_results
+        with st.expander("Per-prompt analyses"):
+            for record_id, analysis in islice(batch_results.items(), st.session_state.batch_page_size):
+                st.markdown(f"**Record ...{record_id[-5:]}**")
+                st.markdown(analysis or "Could not generate analysis.")
+            st.caption(f"Showing {min(st.session_state.batch_page_size, len(batch_results))} of {len(batch_results)} analyses.")
+            if st.session_state.batch_page_size < len(batch_results):
+                if st.button("Load next 25 analyses"):
+                    st.session_state.batch_page_size += 25
+                    st.rerun()